@@ -1,24 +1,152 @@
 # cli_script.py
 import argparse
-import image_converter  # Import the shared module
+import os
+import sys
+import image_converter  # Import the shared module (cheap: Pillow/tqdm are loaded on first use)
+import quality_check
+import tiled_converter
 
-def main():
+def build_parser():
     parser = argparse.ArgumentParser(description="Convert images to WebP format.")
-    parser.add_argument("input_path", help="Path to the input folder or file.")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--interactive", action="store_true",
+                       help="Prompt for input/output folders and settings instead of taking arguments "
+                            "(replaces the old webp_cli_converter.py script).")
+    modes.add_argument("--gui", action="store_true", help="Launch the PyQt6 GUI (same as python webp_gui.py).")
+    parser.add_argument("input_path", nargs="?",
+                        help="Path to the input folder or file. With --manifest: optional root directory "
+                             "that relative manifest paths (and the mirrored output structure) are based on.")
     parser.add_argument("-o", "--output_dir", help="Path to the output directory (optional).")
     parser.add_argument("-q", "--quality", type=int, default=80, help="WebP quality (0-100).")
     parser.add_argument("-l", "--lossless", action="store_true", help="Use lossless compression.")
     parser.add_argument("-r", "--recursive", action="store_true", help="Process subfolders recursively.")
     parser.add_argument("-n", "--no_overwrite", action="store_true", help="Prevent overwriting existing files.")
+    parser.add_argument("-p", "--pipelined", action="store_true",
+                        help="Overlap disk reads, encoding and writes (helps on slow or network disks).")
+    parser.add_argument("--prefetch_depth", type=int, default=4,
+                        help="Pipelined mode: max source files read ahead of the encoder (default 4).")
+    parser.add_argument("--write_depth", type=int, default=4,
+                        help="Pipelined mode: max encoded files queued for writing (default 4).")
+    parser.add_argument("--encode_workers", type=int, default=1,
+                        help="Pipelined mode: number of encoder threads (default 1).")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Pipelined mode: map source files and decode them in place instead of reading them into memory.")
+    parser.add_argument("--tile_size", type=int,
+                        help="Write images too large for a single WebP (over 16383px, e.g. gigapixel TIFFs) "
+                             "as a grid of tiles this size plus index.json, in <name>_tiles/.")
+    parser.add_argument("--pyramid", action="store_true",
+                        help="With --tile_size, also write downsampled levels down to a single tile.")
+    parser.add_argument("--verify", action="store_true",
+                        help="Score each WebP against its source (PSNR/SSIM on downsampled luma and alpha) and report "
+                             "files below the threshold. With -n, checks existing outputs. Requires numpy.")
+    parser.add_argument("--min_ssim", type=float, default=quality_check.DEFAULT_MIN_SSIM,
+                        help=f"Verify mode: report files with SSIM below this (default {quality_check.DEFAULT_MIN_SSIM}).")
+    parser.add_argument("--min_psnr", type=float,
+                        help="Verify mode: also report files with PSNR (dB) below this.")
+    parser.add_argument("--verify_workers", type=int,
+                        help="Verify mode: number of scoring threads (default: CPU count).")
+    parser.add_argument("-m", "--manifest",
+                        help="Convert only the files listed in this manifest ('-' for stdin) instead of "
+                             "walking input_path. JSON Lines by default: a path or "
+                             '{"input": ..., "output": ..., "quality": ...} per line.')
+    parser.add_argument("-0", "--null", action="store_true",
+                        help="Manifest is NUL-delimited paths (e.g. from find -print0) instead of JSON Lines.")
+    return parser
 
-    args = parser.parse_args()
+def run_interactive():
+    """Asks for the conversion settings on stdin, then converts a folder with the shared engine."""
+    input_directory = input("Enter the path to the input folder containing images: ")
+    output_directory = input("Enter the path to the output folder (leave blank to save in input folder): ") or None # Allow blank for same folder
+
+    while True:
+        quality_input = input("Enter WebP quality (0-100, default 80): ") or "80" # Allow default if blank
+        try:
+            quality_level = int(quality_input)
+            if 0 <= quality_level <= 100:
+                break
+        except ValueError:
+            pass
+        print("Invalid input. Please enter an integer between 0 and 100.")
+
+    lossless_input = input("Use lossless WebP compression? (yes/no, default no): ").lower()
+    use_lossless = lossless_input in ('yes', 'y', 'true') # Allow 'y' and 'true'
+
+    image_converter.process_images(input_directory, output_directory, quality=quality_level, lossless=use_lossless)
+
+def run_manifest(args):
+    """Converts the files listed in args.manifest (a path, or '-' for stdin)."""
+    if args.input_path and not os.path.isdir(args.input_path):
+        print(f"Error: With --manifest, input_path must be a directory: {args.input_path}")
+        return
+    if args.recursive:
+        print("Note: --recursive has no effect with --manifest; only the listed files are converted.")
+
+    manifest_format = "null" if args.null else "jsonl"
+    options = dict(manifest_format=manifest_format, input_root=args.input_path, output_dir=args.output_dir,
+                   quality=args.quality, lossless=args.lossless, no_overwrite=args.no_overwrite,
+                   pipelined=args.pipelined, prefetch_depth=args.prefetch_depth, write_depth=args.write_depth,
+                   encode_workers=args.encode_workers, use_mmap=args.mmap,
+                   tile_size=args.tile_size, pyramid=args.pyramid, verify=args.verify,
+                   min_ssim=args.min_ssim, min_psnr=args.min_psnr, verify_workers=args.verify_workers)
+    if args.manifest == "-":
+        image_converter.process_manifest(sys.stdin.buffer, **options)
+        return
+    try:
+        manifest_file = open(args.manifest, 'rb')
+    except OSError as e:
+        print(f"Error: Could not read manifest {args.manifest}: {e}")
+        return
+    with manifest_file:
+        image_converter.process_manifest(manifest_file, **options)
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.interactive or args.gui:
+        mode_option = "--interactive" if args.interactive else "--gui"
+        defaults = vars(parser.parse_args([]))
+        extra_options = [name for name, value in vars(args).items()
+                         if name not in ("interactive", "gui") and value != defaults[name]]
+        if extra_options:
+            parser.error(f"{mode_option} does not take other arguments (got: {', '.join(extra_options)})")
+        if args.interactive:
+            run_interactive()
+        else:
+            import webp_gui  # Deferred: PyQt6 and qt_material are only needed for the GUI
+            webp_gui.main()
+        return
+
+    if args.manifest is None and args.input_path is None:
+        parser.error("input_path is required unless --manifest is given")
 
     if not 0 <= args.quality <= 100:
         print("Error: Quality must be between 0 and 100.")
         return
+    if min(args.prefetch_depth, args.write_depth, args.encode_workers) < 1:
+        print("Error: Queue depths and encode workers must be at least 1.")
+        return
+    if args.tile_size is not None and not 0 < args.tile_size <= tiled_converter.WEBP_MAX_DIMENSION:
+        print(f"Error: Tile size must be between 1 and {tiled_converter.WEBP_MAX_DIMENSION}.")
+        return
+    if args.pyramid and args.tile_size is None:
+        print("Error: --pyramid requires --tile_size.")
+        return
+    if args.verify_workers is not None and args.verify_workers < 1:
+        print("Error: Verify workers must be at least 1.")
+        return
+
+    if args.manifest is not None:
+        run_manifest(args)
+        return
 
     image_converter.process_images(args.input_path, args.output_dir, args.quality, args.lossless,
-                                  args.recursive, args.no_overwrite)
+                                  args.recursive, args.no_overwrite,
+                                  pipelined=args.pipelined, prefetch_depth=args.prefetch_depth,
+                                  write_depth=args.write_depth, encode_workers=args.encode_workers,
+                                  use_mmap=args.mmap, tile_size=args.tile_size, pyramid=args.pyramid,
+                                  verify=args.verify, min_ssim=args.min_ssim, min_psnr=args.min_psnr,
+                                  verify_workers=args.verify_workers)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,30 @@
 # image_converter.py
+import io
+import json
+import mmap
 import os
+import queue
 import sys # For dummy image creation in __main__
-from PIL import Image
-# tqdm is optional here if progress_callback is always used by the GUI
-# but good for standalone use or debugging.
-from tqdm import tqdm
+import threading
+import quality_check
+import tiled_converter
+# Pillow and tqdm are imported where they are first needed so that tools built on this
+# module (cli_script.py --help, the GUI with its own progress callback) start quickly.
 
-def convert_image_to_webp(input_filepath, output_filepath, quality=80, lossless=False):
-    """Converts a single image to WebP format."""
+def convert_image_to_webp(input_filepath, output_filepath, quality=80, lossless=False, create_dirs=True):
+    """
+    Converts a single image to WebP format.
+
+    Pass create_dirs=False when the output directory is already known to exist
+    (process_images creates it once per directory via OutputTreePlan).
+    """
+    from PIL import Image
+    from PIL import WebPImagePlugin # noqa: F401 - registers WebP saving without Image.init() importing every format plugin
     try:
         img = Image.open(input_filepath)
-        # Ensure output directory for this specific file exists
-        os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
+        if create_dirs:
+            # Ensure output directory for this specific file exists
+            os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
         img.save(output_filepath, 'webp', quality=quality, lossless=lossless)
         return True  # Indicate success
     except FileNotFoundError:
@@ -22,8 +35,495 @@ def convert_image_to_webp(input_filepath, output_filepath, quality=80, lossless=
         print(f"Error converting {input_filepath} to {output_filepath}: {e}")
         return False
 
+def read_source_bytes(input_filepath, use_mmap=False):
+    """
+    Returns the contents of a source image for encode_webp_bytes.
+
+    With use_mmap the file is mapped instead of read: the mmap is returned as is and
+    decoded in place by encode_webp_bytes (which closes it), so the file is never
+    copied into a separate buffer.
+    """
+    with open(input_filepath, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0: # mmap cannot map an empty file
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+def encode_webp_bytes(data, quality=80, lossless=False):
+    """Decodes image data (bytes, or an mmap from read_source_bytes, which is closed) and returns it encoded as WebP bytes."""
+    from PIL import Image
+    from PIL import WebPImagePlugin # noqa: F401 - see convert_image_to_webp
+    buffer = io.BytesIO()
+    mapped = isinstance(data, mmap.mmap)
+    try:
+        with Image.open(data if mapped else io.BytesIO(data)) as img:
+            img.save(buffer, 'webp', quality=quality, lossless=lossless)
+    finally:
+        if mapped:
+            data.close()
+    return buffer.getvalue()
+
+def _is_within(path, root):
+    """True if path is root or below it (compared lexically, after normalising both)."""
+    try:
+        relative = os.path.relpath(path or os.curdir, root or os.curdir)
+    except ValueError: # Different drives on Windows
+        return False
+    return relative != os.pardir and not relative.startswith(os.pardir + os.sep) and not os.path.isabs(relative)
+
+class OutputTreePlan:
+    """
+    Maps source directories to output directories, resolving and creating each one once.
+
+    process_images used to compute the relative path and stat/create the target directory
+    for every file. The plan caches those per source directory, remembers which output
+    directories already exist (or were created by this run), and, for no_overwrite runs,
+    lists each output directory once instead of stat-ing every candidate output file.
+    """
+
+    def __init__(self, base_input_dir, output_dir=None, recursive=False, track_existing=False):
+        self.base_input_dir = base_input_dir
+        self.output_dir = output_dir
+        self.recursive = recursive
+        self.track_existing = track_existing
+        self._recursive_base = recursive and bool(output_dir) and os.path.isdir(base_input_dir)
+        self._targets = {}         # source dir -> output dir
+        self._ready_dirs = set()   # output dirs known to exist
+        self._dir_errors = {}      # output dir -> OSError from a failed makedirs
+        self._existing_names = {}  # output dir -> {casefolded name: exact names present on disk}
+        self._display_dirs = {}    # output dir -> dir relative to the display root
+        self._claimed = set()      # normalised paths of every output this run will write
+
+    def target_dir(self, source_dir):
+        """
+        Returns the output directory for files found in source_dir.
+
+        Raises ValueError if source_dir lies outside base_input_dir while mirroring the
+        input tree, since its relative path would point outside output_dir.
+        """
+        target = self._targets.get(source_dir)
+        if target is None:
+            if not self.output_dir:
+                target = source_dir
+            elif self._recursive_base and self.base_input_dir != source_dir:
+                if not _is_within(source_dir, self.base_input_dir):
+                    raise ValueError(f"{source_dir} is outside the input root {self.base_input_dir}")
+                target = os.path.join(self.output_dir, os.path.relpath(source_dir, start=self.base_input_dir))
+            else: # Not recursive, or file is in root of base_input_dir, or input was single file
+                target = self.output_dir
+            self._targets[source_dir] = target
+        return target
+
+    def ensure_dir(self, target):
+        """Creates target if this run has not already seen it. Re-raises a cached OSError on failure."""
+        if target in self._ready_dirs:
+            return
+        if target in self._dir_errors:
+            raise self._dir_errors[target]
+        if os.path.isdir(target or os.curdir): # "" means the current directory
+            if self.track_existing:
+                names = {}
+                for name in os.listdir(target or os.curdir):
+                    names.setdefault(name.casefold(), set()).add(name)
+                self._existing_names[target] = names
+        else:
+            try:
+                os.makedirs(target, exist_ok=True)
+            except OSError as e:
+                self._dir_errors[target] = e
+                raise
+            if self.track_existing:
+                self._existing_names[target] = {}
+        self._ready_dirs.add(target)
+
+    def output_exists(self, target, filename):
+        """Returns True if filename already exists in target (from before this run)."""
+        if self.track_existing:
+            variants = self._existing_names[target].get(filename.casefold())
+            if not variants:
+                return False
+            if filename in variants:
+                return True
+            # Only the case differs: let the filesystem decide (case-insensitive on Windows/macOS)
+        return os.path.exists(os.path.join(target, filename))
+
+    def claim(self, target, filename):
+        """Records that this run will write filename into target. Returns False if it already claimed it."""
+        key = os.path.normcase(os.path.normpath(os.path.join(target, filename)))
+        if key in self._claimed:
+            return False
+        self._claimed.add(key)
+        return True
+
+    def display_path(self, output_filepath):
+        """Returns output_filepath relative to the output root (or input root), for CLI messages."""
+        target, filename = os.path.split(output_filepath)
+        display_dir = self._display_dirs.get(target)
+        if display_dir is None:
+            display_dir = os.path.relpath(target or os.curdir, self.output_dir if self.output_dir else self.base_input_dir)
+            self._display_dirs[target] = display_dir
+        return os.path.join(display_dir, filename) if display_dir != os.curdir else filename
+
+def _plan_conversion_jobs(entries, plan, no_overwrite):
+    """
+    Yields a (input_filepath, output_filepath, status, detail, quality) job for each entry.
+
+    entries are (input_filepath, output_filepath, quality, error) tuples; output_filepath and
+    quality may be None to use the plan's mapping and the run's default quality.
+    status is None for files that still need converting, or "skipped"/"failed" for files
+    already resolved while planning. detail, if set, is the message to report for the file.
+    """
+    for input_filepath, output_filepath, quality, error in entries:
+        if error:
+            yield (input_filepath, None, "failed", error, None)
+            continue
+
+        source_dir, filename = os.path.split(input_filepath)
+        if output_filepath:
+            target_output_dir_for_file, output_webp_filename = os.path.split(output_filepath)
+        else:
+            base_filename, _ = os.path.splitext(filename)
+            output_webp_filename = base_filename + ".webp"
+            try:
+                target_output_dir_for_file = plan.target_dir(source_dir)
+            except ValueError as e:
+                yield (input_filepath, None, "failed", f"Not converting {input_filepath}: {e}", None)
+                continue
+
+        try:
+            plan.ensure_dir(target_output_dir_for_file)
+        except OSError as e:
+            yield (input_filepath, None, "failed",
+                   f"Error creating output subdirectory {target_output_dir_for_file} for {filename}: {e}", None)
+            continue
+
+        output_webp_filepath = os.path.join(target_output_dir_for_file, output_webp_filename)
+
+        # Checked before output_exists so a duplicate is never mistaken for an existing (skipped) output
+        if not plan.claim(target_output_dir_for_file, output_webp_filename):
+            yield (input_filepath, None, "failed",
+                   f"Not converting {filename}: {output_webp_filepath} is already the output of another file in this run", None)
+            continue
+
+        if no_overwrite and plan.output_exists(target_output_dir_for_file, output_webp_filename):
+            yield (input_filepath, output_webp_filepath, "skipped", None, None)
+            continue
+        yield (input_filepath, output_webp_filepath, None, None, quality)
+
+def _tile_index_path(output_filepath):
+    """Returns the index.json written in place of output_filepath when the source is tiled."""
+    return os.path.join(tiled_converter.tiles_dir_for(output_filepath), "index.json")
+
+def _convert_serially(jobs, quality, lossless, tile_size=None, pyramid=False, no_overwrite=False):
+    """Converts jobs one at a time, yielding (input_filepath, output_filepath, status, detail)."""
+    for input_filepath, output_filepath, status, detail, job_quality in jobs:
+        if status is None:
+            job_quality = quality if job_quality is None else job_quality
+            try:
+                if tile_size and tiled_converter.is_oversized(input_filepath):
+                    if no_overwrite and os.path.exists(_tile_index_path(output_filepath)):
+                        output_filepath, status = _tile_index_path(output_filepath), "skipped"
+                    else:
+                        output_filepath, detail = tiled_converter.convert_image_to_webp_tiles(
+                            input_filepath, tiled_converter.tiles_dir_for(output_filepath),
+                            tile_size, job_quality, lossless, pyramid)
+                        status = "converted"
+                else:
+                    converted = convert_image_to_webp(input_filepath, output_filepath, job_quality,
+                                                      lossless, create_dirs=False)
+                    status = "converted" if converted else "failed"
+            except Exception as e:
+                status, detail = "failed", f"Unexpected error processing {os.path.basename(input_filepath)}: {e}"
+        yield (input_filepath, output_filepath, status, detail)
+
+# Reader-stage marker for sources too large for a single WebP; the encoder tiles them from disk
+_TILED = object()
+# How often a blocked pipeline stage wakes up to check whether the pipeline was stopped
+_STAGE_POLL_SECONDS = 0.1
+
+def run_conversion_pipeline(jobs, quality=80, lossless=False, prefetch_depth=4, write_depth=4,
+                            encode_workers=1, use_mmap=False, tile_size=None, pyramid=False, no_overwrite=False):
+    """
+    Converts jobs with disk reads, encoding and disk writes overlapped in separate threads.
+
+    The stages are connected by bounded queues so memory use stays proportional to the
+    queue depths rather than the number of files:
+        reader  -> reads source bytes ahead of the encoders (at most prefetch_depth buffered)
+        encoder -> decodes and encodes WebP in memory (encode_workers threads)
+        writer  -> writes the encoded bytes to disk (at most write_depth buffered)
+
+    Args:
+        jobs (iterable): (input_filepath, output_filepath, status, detail, quality) tuples.
+                         Jobs whose status is not None are passed through untouched. The
+                         iterable is consumed lazily, only as fast as the reader needs it.
+        quality (int): WebP quality setting (0-100), for jobs whose own quality is None.
+        lossless (bool): If True, use lossless WebP compression.
+        prefetch_depth (int): Max source files held in memory waiting for an encoder.
+        write_depth (int): Max encoded files held in memory waiting for the writer.
+        encode_workers (int): Number of encoder threads. Pillow releases the GIL while
+                              encoding, so more than one can help on multi-core machines.
+        use_mmap (bool): Map source files and let the encoders decode them in place,
+                         instead of reading them into memory.
+        tile_size (int, optional): If set, sources too large for a single WebP are not read
+                                   into memory; the encoder writes them as tiles instead
+                                   (see tiled_converter.convert_image_to_webp_tiles).
+        pyramid (bool): With tile_size, also write downsampled pyramid levels.
+        no_overwrite (bool): With tile_size, skip oversized sources whose tiles (index.json)
+                             already exist. Single-file outputs are checked while planning.
+
+    Yields:
+        (input_filepath, output_filepath, status, detail) tuples in completion order,
+        which may differ from the order of jobs. If the caller stops iterating (the
+        generator is closed, or the consumer raises), the stages are told to stop and
+        the queued buffers are dropped.
+    """
+    encode_workers = max(1, encode_workers)
+    read_queue = queue.Queue(maxsize=max(1, prefetch_depth))
+    write_queue = queue.Queue(maxsize=max(1, write_depth))
+    result_queue = queue.Queue()
+    reader_errors = []
+    stop = threading.Event()
+
+    def put(target_queue, item):
+        """Puts item on target_queue unless the pipeline is stopped first. Returns False if stopped."""
+        while not stop.is_set():
+            try:
+                target_queue.put(item, timeout=_STAGE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(source_queue):
+        """Takes the next item from source_queue, or returns None once the pipeline is stopped."""
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=_STAGE_POLL_SECONDS)
+            except queue.Empty:
+                pass
+        return None
+
+    def reader():
+        try:
+            for input_filepath, output_filepath, status, detail, job_quality in jobs:
+                if stop.is_set():
+                    return
+                data = None
+                if status is None:
+                    try:
+                        if tile_size and tiled_converter.is_oversized(input_filepath):
+                            if no_overwrite and os.path.exists(_tile_index_path(output_filepath)):
+                                output_filepath, status = _tile_index_path(output_filepath), "skipped"
+                            else:
+                                data = _TILED
+                        else:
+                            data = read_source_bytes(input_filepath, use_mmap)
+                    except Exception as e:
+                        status, detail = "failed", f"Error reading {input_filepath}: {e}"
+                if not put(read_queue, (input_filepath, output_filepath, status, detail, data,
+                                        quality if job_quality is None else job_quality)):
+                    return
+        except Exception as e:
+            reader_errors.append(e)
+        finally:
+            for _ in range(encode_workers):
+                put(read_queue, None)
+
+    def encoder():
+        while not stop.is_set():
+            item = get(read_queue)
+            if item is None:
+                put(write_queue, None)
+                return
+            input_filepath, output_filepath, status, detail, data, job_quality = item
+            if status is None:
+                try:
+                    if data is _TILED:
+                        output_filepath, detail = tiled_converter.convert_image_to_webp_tiles(
+                            input_filepath, tiled_converter.tiles_dir_for(output_filepath),
+                            tile_size, job_quality, lossless, pyramid)
+                        status, data = "converted", None
+                    else:
+                        data = encode_webp_bytes(data, job_quality, lossless)
+                except Exception as e:
+                    status, detail, data = "failed", f"Error converting {input_filepath} to {output_filepath}: {e}", None
+            if not put(write_queue, (input_filepath, output_filepath, status, detail, data)):
+                return
+
+    def writer():
+        finished_encoders = 0
+        while finished_encoders < encode_workers:
+            if stop.is_set():
+                return
+            item = get(write_queue)
+            if item is None:
+                finished_encoders += 1
+                continue
+            input_filepath, output_filepath, status, detail, data = item
+            if status is None:
+                try:
+                    with open(output_filepath, 'wb') as f:
+                        f.write(data)
+                    status = "converted"
+                except OSError as e:
+                    status, detail = "failed", f"Error writing {output_filepath}: {e}"
+            result_queue.put((input_filepath, output_filepath, status, detail))
+        result_queue.put(None)
+
+    # Daemon threads so an abandoned pipeline never keeps the interpreter alive
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    threads += [threading.Thread(target=encoder, daemon=True) for _ in range(encode_workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            result = result_queue.get()
+            if result is None:
+                break
+            yield result
+    finally:
+        # Also runs when the consumer abandons the generator: release blocked stages and their buffers
+        stop.set()
+        for pending_queue in (read_queue, write_queue, result_queue):
+            while True:
+                try:
+                    pending_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    if reader_errors:
+        raise reader_errors[0]
+
+def _run_jobs(jobs, quality, lossless, pipelined, prefetch_depth, write_depth, encode_workers,
+              use_mmap, tile_size, pyramid, no_overwrite):
+    """Runs planned jobs serially or through run_conversion_pipeline, returning the result iterator."""
+    if pipelined:
+        return run_conversion_pipeline(jobs, quality, lossless, prefetch_depth=prefetch_depth,
+                                       write_depth=write_depth, encode_workers=encode_workers,
+                                       use_mmap=use_mmap, tile_size=tile_size, pyramid=pyramid,
+                                       no_overwrite=no_overwrite)
+    return _convert_serially(jobs, quality, lossless, tile_size, pyramid, no_overwrite)
+
+class _NullProgressBar:
+    """Stands in for tqdm when a progress_callback handles progress reporting, or there is one file."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, n=1):
+        pass
+
+def _start_verification(verify, min_ssim, min_psnr, verify_workers, progress_callback=None):
+    """Returns a quality_check.VerificationRun if verify is set and NumPy is available, else None."""
+    if not verify:
+        return None
+    try:
+        return quality_check.VerificationRun(min_ssim=min_ssim, min_psnr=min_psnr, workers=verify_workers)
+    except ImportError:
+        message = "Verification skipped: NumPy is required for quality checks (pip install numpy)."
+        if progress_callback:
+            progress_callback(0, 0, message)
+        else:
+            print(message)
+        return None
+
+def _report_results(results, total_images, plan, progress_callback=None, verifier=None):
+    """
+    Reports each (input_filepath, output_filepath, status, detail) result and a final summary.
+
+    total_images may be None when the number of files is not known up front (manifest
+    input); progress_callback then receives 0 as the total until the summary.
+    With a verifier, converted and skipped WebP outputs are scored against their sources
+    while later files are still converting; files under the threshold are reported and
+    the scores are added to the summary.
+    Returns (converted_count, skipped_count, failed_count).
+    """
+    converted_count = 0
+    skipped_count = 0
+    failed_count = 0
+    callback_total = total_images or 0
+
+    if progress_callback is None and (total_images is None or total_images > 1):
+        # tqdm is only needed for console progress on multi-file runs; the GUI supplies its
+        # own callback, and importing tqdm would dominate a single-file conversion
+        from tqdm import tqdm
+        pbar = tqdm(total=total_images, desc="Converting Images", unit="img")
+    else:
+        pbar = _NullProgressBar()
+
+    with pbar:
+        for input_filepath, output_webp_filepath, status, detail in results:
+            # Results may arrive out of order when pipelined, so count completions instead of indexing
+            current_progress = converted_count + skipped_count + failed_count + 1
+            filename = os.path.basename(input_filepath)
+
+            if status == "converted":
+                converted_count += 1
+                if detail: # e.g. a note from the tiled converter
+                    if progress_callback:
+                        progress_callback(current_progress, callback_total, detail)
+                    else:
+                        print(detail)
+                message = f"Converted: {filename}" # Simpler message for GUI
+                if progress_callback:
+                    progress_callback(current_progress, callback_total, message)
+                else:
+                    # More detailed for CLI
+                    print(f"Converted: {filename} -> {plan.display_path(output_webp_filepath)}")
+            elif status == "skipped":
+                skipped_count += 1
+                message = f"Skipping: {filename} (already exists)" # Simpler message for GUI
+                if progress_callback:
+                    progress_callback(current_progress, callback_total, message)
+                else:
+                    # More detailed for CLI
+                    print(f"Skipping: {filename} (already exists at {plan.display_path(output_webp_filepath)})")
+            else:
+                failed_count += 1
+                if detail:
+                    if progress_callback:
+                        progress_callback(current_progress, callback_total, detail)
+                    else:
+                        print(detail)
+                elif progress_callback:
+                    # convert_image_to_webp prints its own error, so no extra print here for CLI
+                    progress_callback(current_progress, callback_total, f"Failed to convert {filename}.")
+            if verifier is not None and status in ("converted", "skipped") and output_webp_filepath.endswith(".webp"):
+                verifier.submit(input_filepath, output_webp_filepath) # Tiled outputs (index.json) are not scored
+            pbar.update(1)
+
+    processed_count = converted_count + skipped_count + failed_count
+    summary_message = f"Finished. Converted: {converted_count}, Skipped: {skipped_count}, Failed: {failed_count}."
+    if verifier is not None:
+        for input_filepath, output_webp_filepath, scores, flagged, error in verifier.results():
+            filename = os.path.basename(input_filepath)
+            if error:
+                message = f"Could not verify {filename}: {error}"
+            elif flagged:
+                psnr, ssim, alpha_psnr, alpha_ssim = scores
+                alpha_scores = "" if alpha_ssim is None else f", alpha PSNR: {alpha_psnr:.2f} dB, alpha SSIM: {alpha_ssim:.4f}"
+                message = f"Below quality threshold: {filename} (PSNR: {psnr:.2f} dB, SSIM: {ssim:.4f}{alpha_scores})"
+            else:
+                continue
+            if progress_callback:
+                progress_callback(processed_count, processed_count, message)
+            else:
+                print(message)
+        summary_message += " " + verifier.summary()
+    if progress_callback:
+        progress_callback(processed_count, processed_count, summary_message)
+    else:
+        print(summary_message)
+    return converted_count, skipped_count, failed_count
+
 def process_images(input_path, output_dir=None, quality=80, lossless=False,
-                   recursive=False, no_overwrite=False, progress_callback=None):
+                   recursive=False, no_overwrite=False, progress_callback=None,
+                   pipelined=False, prefetch_depth=4, write_depth=4, encode_workers=1,
+                   use_mmap=False, tile_size=None, pyramid=False, verify=False,
+                   min_ssim=quality_check.DEFAULT_MIN_SSIM, min_psnr=None, verify_workers=None):
     """
     Processes images (PNG, JPG, JPEG) from input_path and converts them to WebP.
 
@@ -39,13 +539,29 @@ def process_images(input_path, output_dir=None, quality=80, lossless=False,
         no_overwrite (bool): If True, do not overwrite existing WebP files in the output.
         progress_callback (function, optional): Callback for progress updates.
                                                 Expected signature: func(current, total, message_str)
+        pipelined (bool): If True, overlap disk reads, encoding and disk writes using
+                          run_conversion_pipeline instead of converting one file at a time.
+        prefetch_depth (int): Pipelined mode only. Max source files read ahead of the encoder.
+        write_depth (int): Pipelined mode only. Max encoded files waiting for the writer.
+        encode_workers (int): Pipelined mode only. Number of encoder threads.
+        use_mmap (bool): Pipelined mode only. Map source files and decode them in place instead of reading them.
+        tile_size (int, optional): If set, images too large for a single WebP (over 16383px
+                                   or Pillow's pixel limit) are written as a grid of
+                                   tile_size WebP tiles plus index.json in <name>_tiles/.
+        pyramid (bool): With tile_size, also write downsampled pyramid levels.
+        verify (bool): If True, score each WebP output against its source (PSNR/SSIM on
+                       downsampled luma and alpha, see quality_check) and add the scores to the summary.
+                       Requires NumPy.
+        min_ssim (float): Verify mode. Files with a lower SSIM are reported.
+        min_psnr (float, optional): Verify mode. Files with a lower PSNR (dB) are also reported.
+        verify_workers (int, optional): Verify mode. Scoring threads (default: CPU count).
     """
 
     images_to_convert = []
     base_input_dir = "" # Used for structuring recursive output
 
     if os.path.isfile(input_path):
-        if input_path.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff', '.bmp')): # Added more common types
+        if input_path.lower().endswith(('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')): # Added more common types
             images_to_convert = [input_path]
             base_input_dir = os.path.dirname(input_path)
         else:
@@ -57,7 +573,7 @@ def process_images(input_path, output_dir=None, quality=80, lossless=False,
             return
     elif os.path.isdir(input_path):
         base_input_dir = input_path
-        image_extensions = ('.png', '.jpg', '.jpeg', '.tiff', '.bmp') # Added more common types
+        image_extensions = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp') # Added more common types
         if recursive:
             for root, _, files in os.walk(input_path):
                 for file in files:
@@ -85,83 +601,130 @@ def process_images(input_path, output_dir=None, quality=80, lossless=False,
         return
 
     total_images = len(images_to_convert)
-    converted_count = 0
-    skipped_count = 0
-    failed_count = 0
+    verifier = _start_verification(verify, min_ssim, min_psnr, verify_workers, progress_callback)
 
-    with tqdm(total=total_images, desc="Converting Images", unit="img", disable=(progress_callback is not None)) as pbar:
-        for i, input_filepath in enumerate(images_to_convert):
-            current_progress = i + 1 # 1-based index for progress reporting
-            filename = os.path.basename(input_filepath)
-            base_filename, _ = os.path.splitext(filename)
-            output_webp_filename = base_filename + ".webp"
-            
-            target_output_dir_for_file = ""
-            if output_dir:
-                if recursive and os.path.isdir(base_input_dir) and base_input_dir != os.path.dirname(input_filepath):
-                    relative_subdir = os.path.relpath(os.path.dirname(input_filepath), start=base_input_dir)
-                    target_output_dir_for_file = os.path.join(output_dir, relative_subdir)
-                else: # Not recursive, or file is in root of base_input_dir, or input was single file
-                    target_output_dir_for_file = output_dir
-            else:
-                target_output_dir_for_file = os.path.dirname(input_filepath)
+    plan = OutputTreePlan(base_input_dir, output_dir, recursive, track_existing=no_overwrite)
+    entries = ((input_filepath, None, None, None) for input_filepath in images_to_convert)
+    jobs = _plan_conversion_jobs(entries, plan, no_overwrite)
+    results = _run_jobs(jobs, quality, lossless, pipelined, prefetch_depth, write_depth, encode_workers,
+                        use_mmap, tile_size, pyramid, no_overwrite)
 
-            if not os.path.exists(target_output_dir_for_file):
-                try:
-                    os.makedirs(target_output_dir_for_file, exist_ok=True)
-                except OSError as e:
-                    message = f"Error creating output subdirectory {target_output_dir_for_file} for {filename}: {e}"
-                    if progress_callback:
-                        progress_callback(current_progress, total_images, message)
-                    else:
-                        print(message)
-                    pbar.update(1)
-                    failed_count +=1
-                    continue
+    _report_results(results, total_images, plan, progress_callback, verifier)
 
-            output_webp_filepath = os.path.join(target_output_dir_for_file, output_webp_filename)
+MANIFEST_FORMATS = ("jsonl", "null")
 
-            if no_overwrite and os.path.exists(output_webp_filepath):
-                message = f"Skipping: {filename} (already exists)" # Simpler message for GUI
-                if progress_callback:
-                    progress_callback(current_progress, total_images, message)
-                else:
-                    # More detailed for CLI
-                    print(f"Skipping: {filename} (already exists at {os.path.relpath(output_webp_filepath, output_dir if output_dir else base_input_dir)})")
-                pbar.update(1)
-                skipped_count +=1
+def iter_manifest(manifest_file, manifest_format="jsonl", input_root=None, output_dir=None):
+    """
+    Streams (input_filepath, output_filepath, quality, error) entries from a manifest.
+
+    The manifest is read incrementally, so very long lists are never held in memory.
+
+    Formats:
+        "jsonl": one JSON value per line, either a path string or an object
+                 {"input": path, "output": path (optional), "quality": 0-100 (optional)}.
+                 Blank lines are ignored.
+        "null":  NUL-delimited input paths (as written by find -print0); paths only.
+
+    Args:
+        manifest_file (binary file object): The manifest, e.g. open(path, 'rb') or sys.stdin.buffer.
+        manifest_format (str): One of MANIFEST_FORMATS.
+        input_root (str, optional): Relative input paths are resolved against this directory.
+        output_dir (str, optional): Relative per-file output paths are resolved against this directory;
+            entries whose output would land outside it are rejected.
+
+    Malformed entries are yielded with error set (and a placeholder input path naming
+    the manifest line) so they are reported as failures without stopping the run.
+    """
+    if manifest_format not in MANIFEST_FORMATS:
+        raise ValueError(f"Unsupported manifest format: {manifest_format}")
+
+    def resolve(path, root):
+        return os.path.join(root, path) if root and not os.path.isabs(path) else path
+
+    if manifest_format == "null":
+        # read1 returns whatever a pipe has buffered, so a slow producer (find -print0) is not
+        # held up until 64 KiB have arrived
+        read = getattr(manifest_file, "read1", manifest_file.read)
+        pending = b""
+        while True:
+            chunk = read(65536)
+            if not chunk:
+                break
+            pending += chunk
+            *paths, pending = pending.split(b"\0")
+            for raw_path in paths:
+                if raw_path:
+                    yield (resolve(os.fsdecode(raw_path), input_root), None, None, None)
+        if pending:
+            yield (resolve(os.fsdecode(pending), input_root), None, None, None)
+        return
+
+    for line_number, raw_line in enumerate(manifest_file, start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        placeholder = f"<manifest line {line_number}>"
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            yield (placeholder, None, None, f"Invalid manifest line {line_number}: {e}")
+            continue
+
+        if isinstance(entry, str):
+            entry = {"input": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("input"), str) or not entry["input"]:
+            yield (placeholder, None, None, f"Invalid manifest line {line_number}: expected a path or an object with an \"input\" path")
+            continue
+
+        input_filepath = resolve(entry["input"], input_root)
+        output_filepath = entry.get("output")
+        quality = entry.get("quality")
+        if output_filepath is not None and not (isinstance(output_filepath, str) and output_filepath):
+            yield (input_filepath, None, None, f"Invalid manifest line {line_number}: \"output\" must be a path")
+            continue
+        if quality is not None and (isinstance(quality, bool) or not isinstance(quality, int) or not 0 <= quality <= 100):
+            yield (input_filepath, None, None, f"Invalid manifest line {line_number}: \"quality\" must be an integer between 0 and 100")
+            continue
+
+        if output_filepath is not None:
+            output_filepath = resolve(output_filepath, output_dir)
+            if output_dir and not _is_within(output_filepath, output_dir):
+                yield (input_filepath, None, None, f"Invalid manifest line {line_number}: \"output\" must stay inside the output directory {output_dir}")
                 continue
 
-            try:
-                if convert_image_to_webp(input_filepath, output_webp_filepath, quality, lossless):
-                    converted_count += 1
-                    message = f"Converted: {filename}" # Simpler message for GUI
-                    if progress_callback:
-                        progress_callback(current_progress, total_images, message)
-                    else:
-                        # More detailed for CLI
-                        print(f"Converted: {filename} -> {os.path.relpath(output_webp_filepath, output_dir if output_dir else base_input_dir)}")
-                else:
-                    failed_count += 1
-                    message = f"Failed to convert {filename}."
-                    if progress_callback:
-                        progress_callback(current_progress, total_images, message)
-                    # convert_image_to_webp prints its own error, so no extra print here for CLI
-            except Exception as e:
-                failed_count += 1
-                message = f"Unexpected error processing {filename}: {e}"
-                if progress_callback:
-                    progress_callback(current_progress, total_images, message)
-                else:
-                    print(message)
-            finally:
-                 pbar.update(1)
+        yield (input_filepath, output_filepath, quality, None)
+
+def process_manifest(manifest_file, manifest_format="jsonl", input_root=None, output_dir=None,
+                     quality=80, lossless=False, no_overwrite=False, progress_callback=None,
+                     pipelined=False, prefetch_depth=4, write_depth=4, encode_workers=1,
+                     use_mmap=False, tile_size=None, pyramid=False, verify=False,
+                     min_ssim=quality_check.DEFAULT_MIN_SSIM, min_psnr=None, verify_workers=None):
+    """
+    Converts exactly the images listed in a manifest instead of walking a directory tree.
+
+    Entries are streamed from the manifest into the conversion (serial or pipelined), so the
+    list is never loaded into memory and conversion starts with the first entry.
+
+    Args:
+        manifest_file (binary file object): Manifest to read, see iter_manifest for the formats.
+        manifest_format (str): "jsonl" or "null".
+        input_root (str, optional): Directory relative input paths are resolved against. With
+                                    output_dir, the structure below it is mirrored in output_dir.
+        output_dir (str, optional): Directory for WebP files without an explicit output path.
+                                    If None, WebP images are saved alongside originals.
+        Remaining arguments are as for process_images; quality is the default for entries
+        that do not set their own.
+    """
+    verifier = _start_verification(verify, min_ssim, min_psnr, verify_workers, progress_callback)
+    entries = iter_manifest(manifest_file, manifest_format, input_root, output_dir)
+    # Manifests usually name a few files in huge trees: stat candidates instead of listing directories
+    plan = OutputTreePlan(input_root or os.curdir, output_dir, recursive=bool(input_root), track_existing=False)
+    jobs = _plan_conversion_jobs(entries, plan, no_overwrite)
+    results = _run_jobs(jobs, quality, lossless, pipelined, prefetch_depth, write_depth, encode_workers,
+                        use_mmap, tile_size, pyramid, no_overwrite)
+
+    _report_results(results, None, plan, progress_callback, verifier)
 
-    summary_message = f"Finished. Converted: {converted_count}, Skipped: {skipped_count}, Failed: {failed_count}."
-    if progress_callback:
-        progress_callback(total_images, total_images, summary_message)
-    else:
-        print(summary_message)
 
 # Example standalone usage:
 if __name__ == '__main__':
@@ -173,6 +736,7 @@ if __name__ == '__main__':
         os.makedirs(os.path.join(test_input_dir, "subdir"), exist_ok=True)
     
     try:
+        from PIL import Image
         Image.new('RGB', (60, 30), color = 'red').save(os.path.join(test_input_dir, "img1.png"))
         Image.new('RGB', (60, 30), color = 'blue').save(os.path.join(test_input_dir, "img2.jpg"))
         Image.new('RGB', (60, 30), color = 'green').save(os.path.join(test_input_dir, "subdir", "img3.jpeg"))
@@ -198,4 +762,8 @@ if __name__ == '__main__':
     print(f"\n--- Test 4: Recursive, no output_dir (save alongside) ---")
     process_images(test_input_dir, output_dir=None, recursive=True, no_overwrite=True)
 
+    print(f"\n--- Test 5: Pipelined recursive conversion to '{os.path.join(test_output_dir, 'pipelined_test')}' ---")
+    process_images(test_input_dir, output_dir=os.path.join(test_output_dir, 'pipelined_test'), recursive=True,
+                   pipelined=True, prefetch_depth=2, write_depth=2, encode_workers=2, use_mmap=True)
+
     print("\nStandalone tests complete. Check directories and console output.")
@@ -0,0 +1,147 @@
+# quality_check.py
+import os
+
+# Scores are computed on luma (and alpha) images downsampled so their longest side is at most this
+DEFAULT_MAX_DIMENSION = 512
+DEFAULT_MIN_SSIM = 0.95
+# Identical images have infinite PSNR; report them as this instead so averages stay finite
+PSNR_CAP = 100.0
+SSIM_WINDOW = 7
+
+def compute_psnr(reference, candidate):
+    """Returns the PSNR in dB between two equally sized 8-bit NumPy arrays (capped at PSNR_CAP)."""
+    import numpy as np
+    mse = np.mean((reference.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    if mse == 0:
+        return PSNR_CAP
+    return min(PSNR_CAP, float(10 * np.log10(255.0 ** 2 / mse)))
+
+def _window_mean(values, size):
+    """Mean over every size x size window ("valid" positions only), using a summed-area table."""
+    import numpy as np
+    table = np.pad(values.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    window_sums = table[size:, size:] - table[:-size, size:] - table[size:, :-size] + table[:-size, :-size]
+    return window_sums / (size * size)
+
+def compute_ssim(reference, candidate):
+    """Returns the mean SSIM between two equally sized 8-bit grayscale NumPy arrays (uniform 7x7 window)."""
+    import numpy as np
+    x = reference.astype(np.float64)
+    y = candidate.astype(np.float64)
+    size = min(SSIM_WINDOW, *x.shape)
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+
+    mu_x = _window_mean(x, size)
+    mu_y = _window_mean(y, size)
+    var_x = _window_mean(x * x, size) - mu_x * mu_x
+    var_y = _window_mean(y * y, size) - mu_y * mu_y
+    cov_xy = _window_mean(x * y, size) - mu_x * mu_y
+
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * cov_xy + c2)) / ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))
+    return float(ssim_map.mean())
+
+def _load_planes(filepath, size):
+    """
+    Loads an image resized to size as (luma, alpha) arrays; alpha is None if the image has no transparency.
+
+    Transparent images are composited onto black before taking luma, so colour under
+    transparent pixels (which WebP may discard) is not counted as a difference.
+    """
+    import numpy as np
+    from PIL import Image
+    with Image.open(filepath) as img:
+        if not img.has_transparency_data:
+            img.draft("L", size) # Lets the JPEG decoder skip detail we are about to throw away
+            return np.asarray(img.convert("L").resize(size, Image.Resampling.BOX)), None
+        rgba = img.convert("RGBA").resize(size, Image.Resampling.BOX)
+    luma = Image.alpha_composite(Image.new("RGBA", size, (0, 0, 0, 255)), rgba).convert("L")
+    return np.asarray(luma), np.asarray(rgba.getchannel("A"))
+
+def compare_to_source(source_filepath, webp_filepath, max_dimension=DEFAULT_MAX_DIMENSION):
+    """
+    Returns (psnr, ssim, alpha_psnr, alpha_ssim) for a WebP output against the image it was converted from.
+
+    Both images are reduced to luma and downsampled to the same size (longest side at
+    most max_dimension), which is enough to catch visible degradation at a fraction of
+    the cost of comparing full-resolution images. The alpha channel is scored on its
+    own; alpha_psnr and alpha_ssim are None when neither image has transparency.
+    """
+    import numpy as np
+    from PIL import Image
+    with Image.open(source_filepath) as img:
+        width, height = img.size
+    scale = max(1.0, max(width, height) / max_dimension)
+    size = (max(1, round(width / scale)), max(1, round(height / scale)))
+
+    reference, reference_alpha = _load_planes(source_filepath, size)
+    candidate, candidate_alpha = _load_planes(webp_filepath, size)
+    psnr, ssim = compute_psnr(reference, candidate), compute_ssim(reference, candidate)
+    if reference_alpha is None and candidate_alpha is None:
+        return psnr, ssim, None, None
+    opaque = np.full(reference.shape, 255, dtype=np.uint8)
+    reference_alpha = opaque if reference_alpha is None else reference_alpha
+    candidate_alpha = opaque if candidate_alpha is None else candidate_alpha
+    return psnr, ssim, compute_psnr(reference_alpha, candidate_alpha), compute_ssim(reference_alpha, candidate_alpha)
+
+class VerificationRun:
+    """
+    Scores conversions in a thread pool while the rest of the batch is still running.
+
+    Pillow and NumPy release the GIL for decoding, resizing and the array math, so
+    threads verify files in parallel. Raises ImportError if NumPy is not installed.
+    """
+
+    def __init__(self, min_ssim=DEFAULT_MIN_SSIM, min_psnr=None, workers=None,
+                 max_dimension=DEFAULT_MAX_DIMENSION):
+        import numpy # noqa: F401 - fail early, before any conversion work, if NumPy is missing
+        from concurrent.futures import ThreadPoolExecutor
+        self.min_ssim = min_ssim
+        self.min_psnr = min_psnr
+        self.max_dimension = max_dimension
+        self._executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._pending = []
+        self._scores = []
+
+    def submit(self, source_filepath, webp_filepath):
+        """Queues source_filepath/webp_filepath for scoring."""
+        future = self._executor.submit(compare_to_source, source_filepath, webp_filepath, self.max_dimension)
+        self._pending.append((source_filepath, webp_filepath, future))
+
+    def is_below_threshold(self, psnr, ssim, alpha_psnr=None, alpha_ssim=None):
+        """True if the luma scores, or the alpha scores when given, are below the thresholds."""
+        scores = [(psnr, ssim)] if alpha_ssim is None else [(psnr, ssim), (alpha_psnr, alpha_ssim)]
+        return any(s < self.min_ssim or (self.min_psnr is not None and p < self.min_psnr) for p, s in scores)
+
+    def results(self):
+        """
+        Waits for all queued comparisons, yielding (source, webp, scores, flagged, error).
+
+        scores is the (psnr, ssim, alpha_psnr, alpha_ssim) tuple from compare_to_source.
+        scores and flagged are None when the comparison failed; error is then set.
+        """
+        try:
+            for source_filepath, webp_filepath, future in self._pending:
+                try:
+                    scores = future.result()
+                except Exception as e:
+                    yield (source_filepath, webp_filepath, None, None, str(e))
+                    continue
+                self._scores.append(scores)
+                yield (source_filepath, webp_filepath, scores, self.is_below_threshold(*scores), None)
+        finally:
+            self._pending = []
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self):
+        """Returns a one-line summary of the scores collected by results()."""
+        if not self._scores:
+            return "Verified: 0."
+        mean_psnr = sum(scores[0] for scores in self._scores) / len(self._scores)
+        mean_ssim = sum(scores[1] for scores in self._scores) / len(self._scores)
+        worst_ssim = min(scores[1] for scores in self._scores)
+        alpha_ssims = [scores[3] for scores in self._scores if scores[3] is not None]
+        flagged_count = sum(1 for scores in self._scores if self.is_below_threshold(*scores))
+        alpha_summary = f"Worst alpha SSIM: {min(alpha_ssims):.4f}, " if alpha_ssims else ""
+        return (f"Verified: {len(self._scores)}, Mean PSNR: {mean_psnr:.2f} dB, Mean SSIM: {mean_ssim:.4f}, "
+                f"Worst SSIM: {worst_ssim:.4f}, {alpha_summary}Below threshold: {flagged_count}.")
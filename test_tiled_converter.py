@@ -0,0 +1,138 @@
+# test_tiled_converter.py
+# Round-trip checks for tiled_converter. Region-by-region decoding relies on Pillow internals
+# (see the note at the top of tiled_converter.py), so run these after upgrading Pillow:
+#     python -m unittest test_tiled_converter
+import json
+import math
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+import tiled_converter
+
+def _noise_image(mode, size):
+    bands = len(mode) if mode != "L" else 1
+    return Image.frombytes(mode, size, os.urandom(size[0] * size[1] * bands))
+
+def _write_tiled_tiff(filepath, img, tile):
+    """Writes an RGB image as an uncompressed tiled TIFF (Pillow itself only writes strips)."""
+    width, height = img.size
+    blocks = [img.crop((left, top, left + tile, top + tile)).tobytes() # Edge tiles are padded with black
+              for top in range(0, height, tile) for left in range(0, width, tile)]
+    offsets = [8 + i * len(blocks[0]) for i in range(len(blocks))]
+    bits_offset = offsets[-1] + len(blocks[-1])
+    offsets_offset = bits_offset + 6
+    counts_offset = offsets_offset + 4 * len(blocks)
+    ifd_offset = counts_offset + 4 * len(blocks)
+    entries = [ # (tag, type (3 = SHORT, 4 = LONG), count, value or offset)
+        (256, 4, 1, width), (257, 4, 1, height), (258, 3, 3, bits_offset), (259, 3, 1, 1),
+        (262, 3, 1, 2), (277, 3, 1, 3), (284, 3, 1, 1), (322, 3, 1, tile), (323, 3, 1, tile),
+        (324, 4, len(blocks), offsets_offset if len(blocks) > 1 else offsets[0]),
+        (325, 4, len(blocks), counts_offset if len(blocks) > 1 else len(blocks[0])),
+    ]
+    with open(filepath, 'wb') as f:
+        f.write(b"II*\0" + struct.pack("<I", ifd_offset))
+        for block in blocks:
+            f.write(block)
+        f.write(struct.pack("<3H", 8, 8, 8))
+        f.write(struct.pack(f"<{len(blocks)}I", *offsets))
+        f.write(struct.pack(f"<{len(blocks)}I", *[len(block) for block in blocks]))
+        f.write(struct.pack("<H", len(entries)))
+        for tag, kind, count, value in entries:
+            if kind == 3 and count == 1:
+                f.write(struct.pack("<HHIHH", tag, kind, count, value, 0))
+            else:
+                f.write(struct.pack("<HHII", tag, kind, count, value))
+        f.write(struct.pack("<I", 0))
+
+def _stitch_level(index_filepath, level=0):
+    """Reassembles one level of a tile set written by convert_image_to_webp_tiles."""
+    tiles_dir = os.path.dirname(index_filepath)
+    with open(index_filepath, encoding='utf-8') as f:
+        index = json.load(f)
+    info = index["levels"][level]
+    tile_size = index["tile_size"]
+    stitched = None
+    for row in range(info["rows"]):
+        for column in range(info["columns"]):
+            with Image.open(os.path.join(tiles_dir, str(level), f"{column}_{row}.webp")) as tile:
+                if stitched is None:
+                    stitched = Image.new(tile.mode, (info["width"], info["height"]))
+                stitched.paste(tile, (column * tile_size, row * tile_size))
+    return stitched
+
+class TiledConverterTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def assert_round_trip(self, source_filepath, expected, tile_size, pyramid=False):
+        index_filepath, note = tiled_converter.convert_image_to_webp_tiles(
+            source_filepath, self.path(f"tiles_{tile_size}"), tile_size, lossless=True, pyramid=pyramid)
+        stitched = _stitch_level(index_filepath)
+        self.assertEqual(stitched.size, expected.size)
+        self.assertEqual(stitched.convert(expected.mode).tobytes(), expected.tobytes())
+        return index_filepath, note
+
+    def test_tiled_tiff_is_read_region_by_region(self):
+        source = _noise_image("RGB", (450, 330))
+        _write_tiled_tiff(self.path("tiled.tif"), source, 64)
+        for tile_size in (50, 128, 1000): # Smaller than, not aligned with, and larger than the source tiles
+            _, note = self.assert_round_trip(self.path("tiled.tif"), source, tile_size)
+            self.assertIsNone(note)
+
+    def test_striped_tiffs_are_read_region_by_region(self):
+        rgb = _noise_image("RGB", (300, 220))
+        gray = _noise_image("L", (300, 220))
+        rgb.save(self.path("strips.tif"), tiffinfo={278: 16}) # RowsPerStrip
+        rgb.save(self.path("one_strip.tif"))
+        gray.save(self.path("gray.tif"), tiffinfo={278: 7})
+        with Image.open(self.path("strips.tif")) as img:
+            self.assertGreater(len(img.tile), 1)
+        for filename, expected in (("strips.tif", rgb), ("one_strip.tif", rgb), ("gray.tif", gray)):
+            for tile_size in (50, 128):
+                _, note = self.assert_round_trip(self.path(filename), expected, tile_size)
+                self.assertIsNone(note)
+
+    def test_pyramid_levels_halve_down_to_one_tile(self):
+        source = _noise_image("RGB", (300, 220))
+        source.save(self.path("strips.tif"), tiffinfo={278: 16})
+        index_filepath, _ = self.assert_round_trip(self.path("strips.tif"), source, 64, pyramid=True)
+        with open(index_filepath, encoding='utf-8') as f:
+            levels = json.load(f)["levels"]
+        for previous, level in zip(levels, levels[1:]):
+            self.assertEqual((level["width"], level["height"]),
+                             (math.ceil(previous["width"] / 2), math.ceil(previous["height"] / 2)))
+            self.assertEqual(_stitch_level(index_filepath, level["level"]).size, (level["width"], level["height"]))
+        self.assertEqual((levels[-1]["columns"], levels[-1]["rows"]), (1, 1))
+
+    def test_other_formats_are_loaded_whole_with_a_note(self):
+        source = _noise_image("RGB", (200, 150))
+        source.save(self.path("source.png"))
+        _, note = self.assert_round_trip(self.path("source.png"), source, 64)
+        self.assertIn("loaded whole", note)
+
+    def test_pixel_limit_applies_only_to_whole_loads(self):
+        source = _noise_image("RGB", (200, 150))
+        source.save(self.path("source.png"))
+        source.save(self.path("strips.tif"), tiffinfo={278: 16})
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 10000):
+            self.assertTrue(tiled_converter.is_oversized(self.path("source.png")))
+            with self.assertRaises(ValueError):
+                tiled_converter.convert_image_to_webp_tiles(self.path("source.png"), self.path("png_tiles"), 64)
+            self.assertFalse(os.path.exists(self.path("png_tiles")))
+            self.assert_round_trip(self.path("strips.tif"), source, 64) # Regions stay within tile_size
+            self.assertEqual(Image.MAX_IMAGE_PIXELS, 10000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+# tiled_converter.py
+# Reading a source region by region uses Pillow internals: the decoder tile list
+# (ImageFile.tile, ImageFile._Tile on Pillow >= 11), Image._size, TiffImageFile._tile_size,
+# Image.core.new and Image._new, and opening files through the registered format plugins.
+# These are not public API. They are checked against the Pillow version pinned in
+# requirements.txt (11.2.1) and against 12.x; test_tiled_converter.py stitches tiles back
+# together and compares them to the source, so run it after any Pillow upgrade.
+import bisect
+import json
+import math
+import os
+import struct
+
+# Largest width/height a single WebP image can have
+WEBP_MAX_DIMENSION = 16383
+
+def _open_unchecked(fp):
+    """
+    Opens an image from a binary file lazily, without Pillow's decompression-bomb check.
+
+    Only for reading headers and decoding bounded regions: Image.open() runs the check
+    once it has identified the format, so the registered format plugins are tried
+    directly instead, leaving the process-wide MAX_IMAGE_PIXELS alone. fp stays owned by
+    the caller, so Pillow does not close it after a load.
+    """
+    from PIL import Image, UnidentifiedImageError
+    Image.init()
+    prefix = fp.read(16)
+    for format_id in Image.ID:
+        factory, accept = Image.OPEN[format_id]
+        accepted = not accept or accept(prefix)
+        if not accepted or isinstance(accepted, str): # A string means "recognised, but unsupported"
+            continue
+        fp.seek(0)
+        try:
+            return factory(fp)
+        except (SyntaxError, IndexError, TypeError, struct.error):
+            continue
+    raise UnidentifiedImageError(f"cannot identify image file {getattr(fp, 'name', fp)!r}")
+
+def is_oversized(input_filepath):
+    """
+    Returns True if the image cannot be converted to a single WebP in one go.
+
+    Only the header is read: the image is oversized if either dimension exceeds
+    WEBP_MAX_DIMENSION or it has more pixels than Pillow's MAX_IMAGE_PIXELS.
+    """
+    from PIL import Image
+    with open(input_filepath, 'rb') as f, _open_unchecked(f) as img:
+        width, height = img.size
+    too_many_pixels = Image.MAX_IMAGE_PIXELS is not None and width * height > Image.MAX_IMAGE_PIXELS
+    return width > WEBP_MAX_DIMENSION or height > WEBP_MAX_DIMENSION or too_many_pixels
+
+def _raw_row_stride(img, tile):
+    """
+    Returns the byte length of one row of a raw, top-down, full-width tile, or None.
+
+    Rows of such a tile are stored back to back, so any run of them can be decoded on its
+    own by advancing the tile's file offset (Pillow writes uncompressed TIFFs as one strip).
+    """
+    from PIL import Image
+    codec, (x0, _, x1, _), _, args = tile
+    if codec != "raw" or x0 != 0 or x1 != img.size[0] or len(args) < 3 or args[2] != 1:
+        return None
+    rawmode, stride = args[0], args[1]
+    if stride:
+        return stride
+    try:
+        return len(Image.new(img.mode, (x1, 1)).tobytes("raw", rawmode))
+    except (ValueError, OSError):
+        return None
+
+def _supports_partial_decode(img):
+    """True if regions can be decoded without the whole image (e.g. uncompressed or strip/tiled TIFF)."""
+    if any(tile[0] == "libtiff" for tile in img.tile):
+        return False
+    return len(img.tile) > 1 or (len(img.tile) == 1 and _raw_row_stride(img, img.tile[0]) is not None)
+
+def _is_striped(img):
+    """True if every decoder tile spans the full image width (TIFF strips rather than tiles)."""
+    width = img.size[0]
+    return all(tile[1][0] == 0 and tile[1][2] == width for tile in img.tile)
+
+def _retile(tile, extents, offset):
+    """Returns a copy of a decoder tile with new extents and file offset."""
+    if hasattr(tile, "_replace"): # Pillow >= 11 uses an ImageFile._Tile named tuple
+        return tile._replace(extents=extents, offset=offset)
+    return (tile[0], extents, offset, tile[3])
+
+class _RegionReader:
+    """
+    Decodes regions of one source image, opening the file and parsing its header once.
+
+    The source's decoder tile list is kept; each read() narrows a copy of it to the
+    entries that intersect the region, re-based onto their union, and decodes just
+    those, so peak memory is that union rather than the whole image. Regions can only
+    be read when partial is True (see _supports_partial_decode).
+    """
+
+    def __init__(self, input_filepath):
+        self._file = open(input_filepath, 'rb')
+        try:
+            self._img = _open_unchecked(self._file)
+        except BaseException:
+            self._file.close()
+            raise
+        self.size = self._img.size
+        self.partial = _supports_partial_decode(self._img)
+        self.striped = self.partial and _is_striped(self._img)
+        # Source tiles grouped into rows (by extents) and sorted by position, so read() can
+        # bisect to the tiles a region overlaps instead of scanning all of them
+        rows = {}
+        for tile in self._img.tile:
+            x0, y0, x1, y1 = tile[1]
+            rows.setdefault((y0, y1), []).append((x0, x1, tile, _raw_row_stride(self._img, tile)))
+        self._rows = [(y0, y1, sorted(row, key=lambda entry: entry[0])) for (y0, y1), row in sorted(rows.items())]
+        self._row_tops = [row[0] for row in self._rows]
+        self._row_bottoms = [row[1] for row in self._rows]
+        self._row_lefts = [[entry[0] for entry in row[2]] for row in self._rows]
+        self._row_rights = [[entry[1] for entry in row[2]] for row in self._rows]
+
+    def read(self, box):
+        """Returns the (left, top, right, bottom) box of the source as a new image."""
+        from PIL import Image
+        bx0, by0, bx1, by1 = box
+        selected = []
+        for row_index in range(bisect.bisect_right(self._row_bottoms, by0), bisect.bisect_left(self._row_tops, by1)):
+            y0, y1, row = self._rows[row_index]
+            lefts, rights = self._row_lefts[row_index], self._row_rights[row_index]
+            for x0, x1, tile, row_stride in row[bisect.bisect_right(rights, bx0):bisect.bisect_left(lefts, bx1)]:
+                if row_stride is not None:
+                    # Skip the rows of this strip that lie outside the region
+                    top, bottom = max(y0, by0), min(y1, by1)
+                    tile = _retile(tile, (x0, top, x1, bottom), tile[2] + (top - y0) * row_stride)
+                selected.append(tile)
+        ux0 = min(tile[1][0] for tile in selected)
+        uy0 = min(tile[1][1] for tile in selected)
+        ux1 = max(tile[1][2] for tile in selected)
+        uy1 = max(tile[1][3] for tile in selected)
+
+        img = self._img
+        img.tile = [_retile(tile, (tile[1][0] - ux0, tile[1][1] - uy0, tile[1][2] - ux0, tile[1][3] - uy0), tile[2])
+                    for tile in selected]
+        img._size = (ux1 - ux0, uy1 - uy0)
+        if hasattr(img, "_tile_size"): # TIFF allocates its decode buffer from this (Pillow >= 10.1)
+            img._tile_size = img._size
+        img.fp = self._file # load() drops its file reference when it finishes
+        # A fresh buffer per region (never reuse one an earlier region still shares). Allocating
+        # it here also skips TIFF's whole-image bomb check; a region is bounded by the tile size.
+        img.im = Image.core.new(img.mode, img._size)
+        img.load()
+        region = img._new(img.im)
+        if (ux0, uy0, ux1, uy1) == tuple(box):
+            return region # Already exactly the region: keep the decoded data, skip a copy
+        return region.crop((bx0 - ux0, by0 - uy0, bx1 - ux0, by1 - uy0))
+
+    def close(self):
+        self._img.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+def _tile_path(tiles_dir, level, column, row):
+    return os.path.join(tiles_dir, str(level), f"{column}_{row}.webp")
+
+def _write_base_level(reader, input_filepath, tiles_dir, tile_size, quality, lossless):
+    """
+    Writes level 0 (full resolution) tiles, reading the source region by region where possible.
+
+    Returns (level, loaded_whole); loaded_whole is True if the source had to be decoded in one piece.
+    """
+    from PIL import Image
+    width, height = reader.size
+    columns = math.ceil(width / tile_size)
+    rows = math.ceil(height / tile_size)
+    os.makedirs(os.path.join(tiles_dir, "0"), exist_ok=True)
+
+    whole = None
+    if not reader.partial:
+        # Single-block sources (compressed TIFFs decoded by libtiff, PNG, ...) cannot be
+        # read piecewise by Pillow: decode once, then cut tiles from memory. This goes
+        # through Image.open, so Pillow's decompression-bomb limit still applies.
+        whole = Image.open(input_filepath)
+        whole.load()
+
+    try:
+        for row in range(rows):
+            top = row * tile_size
+            bottom = min(top + tile_size, height)
+            band = None # Release the previous band before decoding the next one
+            band = reader.read((0, top, width, bottom)) if reader.striped else None
+            for column in range(columns):
+                left = column * tile_size
+                right = min(left + tile_size, width)
+                if reader.striped:
+                    tile = band.crop((left, 0, right, bottom - top))
+                elif reader.partial:
+                    tile = reader.read((left, top, right, bottom))
+                else:
+                    tile = whole.crop((left, top, right, bottom))
+                tile.save(_tile_path(tiles_dir, 0, column, row), 'webp', quality=quality, lossless=lossless)
+    finally:
+        if whole is not None:
+            whole.close()
+
+    return {"level": 0, "width": width, "height": height, "columns": columns, "rows": rows}, not reader.partial
+
+def _write_reduced_level(tiles_dir, previous, tile_size, quality, lossless):
+    """Builds the next pyramid level by halving 2x2 groups of the previous level's tiles."""
+    from PIL import Image
+    level = previous["level"] + 1
+    width = math.ceil(previous["width"] / 2)
+    height = math.ceil(previous["height"] / 2)
+    columns = math.ceil(width / tile_size)
+    rows = math.ceil(height / tile_size)
+    os.makedirs(os.path.join(tiles_dir, str(level)), exist_ok=True)
+
+    for row in range(rows):
+        for column in range(columns):
+            child_columns = [c for c in (2 * column, 2 * column + 1) if c < previous["columns"]]
+            child_rows = [r for r in (2 * row, 2 * row + 1) if r < previous["rows"]]
+            children = {(c, r): Image.open(_tile_path(tiles_dir, previous["level"], c, r))
+                        for c in child_columns for r in child_rows}
+            try:
+                canvas_width = sum(children[(c, child_rows[0])].size[0] for c in child_columns)
+                canvas_height = sum(children[(child_columns[0], r)].size[1] for r in child_rows)
+                first_child = children[(child_columns[0], child_rows[0])]
+                canvas = Image.new(first_child.mode, (canvas_width, canvas_height))
+                for (c, r), child in children.items():
+                    canvas.paste(child, ((c - 2 * column) * tile_size, (r - 2 * row) * tile_size))
+            finally:
+                for child in children.values():
+                    child.close()
+            canvas.reduce(2).save(_tile_path(tiles_dir, level, column, row), 'webp', quality=quality, lossless=lossless)
+
+    return {"level": level, "width": width, "height": height, "columns": columns, "rows": rows}
+
+def tiles_dir_for(output_filepath):
+    """Returns the tile directory used in place of output_filepath (photo.webp -> photo_tiles)."""
+    return os.path.splitext(output_filepath)[0] + "_tiles"
+
+def convert_image_to_webp_tiles(input_filepath, tiles_dir, tile_size=1024, quality=80, lossless=False, pyramid=False):
+    """
+    Converts a very large image into a grid of WebP tiles plus an index.json.
+
+    Tiles are written to tiles_dir/<level>/<column>_<row>.webp, level 0 being full
+    resolution. With pyramid=True, each further level halves the previous one until the
+    whole image fits in a single tile; these levels are built from the previous level's
+    tiles, so they never need the full-size image in memory.
+
+    Uncompressed strip or tiled TIFFs are decoded region by region, so peak memory is
+    bounded by tile_size (times the image width for strips). Pillow decodes compressed
+    TIFFs and other formats in one piece; those are loaded whole once and then tiled,
+    which is only allowed within Pillow's MAX_IMAGE_PIXELS. Larger sources of that kind
+    raise ValueError (convert them to an uncompressed tiled TIFF first).
+
+    Returns:
+        tuple: (index_filepath, note) - the path to the written index.json, and a message for
+               the caller to report (e.g. that the source was loaded whole), or None.
+    """
+    if not 0 < tile_size <= WEBP_MAX_DIMENSION:
+        raise ValueError(f"tile_size must be between 1 and {WEBP_MAX_DIMENSION}")
+
+    from PIL import Image
+    with _RegionReader(input_filepath) as reader:
+        width, height = reader.size
+        if not reader.partial and Image.MAX_IMAGE_PIXELS is not None and width * height > Image.MAX_IMAGE_PIXELS:
+            raise ValueError(f"{os.path.basename(input_filepath)} is {width}x{height}, which is over Pillow's "
+                             f"{Image.MAX_IMAGE_PIXELS}-pixel limit, and it cannot be decoded region by region "
+                             "(only uncompressed TIFFs can); refusing to load it whole")
+        base_level, loaded_whole = _write_base_level(reader, input_filepath, tiles_dir, tile_size, quality, lossless)
+    levels = [base_level]
+    while pyramid and (levels[-1]["columns"] > 1 or levels[-1]["rows"] > 1):
+        levels.append(_write_reduced_level(tiles_dir, levels[-1], tile_size, quality, lossless))
+
+    index = {
+        "source": os.path.basename(input_filepath),
+        "width": width,
+        "height": height,
+        "tile_size": tile_size,
+        "format": "webp",
+        "quality": quality,
+        "lossless": lossless,
+        "tile_path": "{level}/{column}_{row}.webp",
+        "levels": levels,
+    }
+    index_filepath = os.path.join(tiles_dir, "index.json")
+    with open(index_filepath, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    note = None
+    if loaded_whole:
+        note = f"Note: {os.path.basename(input_filepath)} cannot be decoded region by region; it was loaded whole."
+    return index_filepath, note
@@ -281,7 +281,7 @@ class ImageConverterGUI(QMainWindow):
                 self,
                 "Select Input File",
                 start_dir,
-                "Image Files (*.png *.jpg *.jpeg *.bmp *.tiff);;All Files (*)"
+                "Image Files (*.png *.jpg *.jpeg *.bmp *.tif *.tiff);;All Files (*)"
             )
             if path:
                 selected_path = path
@@ -457,7 +457,7 @@ class ImageConverterGUI(QMainWindow):
             QMessageBox.critical(self, "Zipping Error", f"Could not zip output folder '{folder_to_zip}':\n{e}")
 
 
-if __name__ == "__main__":
+def main():
     app = QApplication(sys.argv)
 
     # Apply initial theme if qt_material is available
@@ -472,3 +472,7 @@ if __name__ == "__main__":
     window = ImageConverterGUI()
     window.show()
     sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()